@@ -2,10 +2,11 @@
 CountyMapping by Andy Wang
 ========================================================================================
 This Python module contains a dictionary mapping counties that appear
-in my data set to their coordinates on county_map.jpg.
+in my data set to their coordinates on county_map.jpg, along with an array version of it.
 ========================================================================================
 Copyright (c) 2020 Andy Wang
 """
+import numpy as np
 
 # A Dict[str, Tuple[int, int]]
 # tuple of x and y values in pixels
@@ -39,3 +40,10 @@ MAPPING = {'Ventura': (212, 398),
            'Mariposa': (176, 236),
            'San Diego': (314, 469)
            }
+
+# A Dict[str, int] mapping each county to its row in MAPPING_ARR
+COUNTY_INDEX = {county: i for i, county in enumerate(MAPPING)}
+
+# The coordinates in MAPPING as an array with one (x, y) row per county,
+# so that many counties' coordinates can be looked up and offset at once
+MAPPING_ARR = np.array(list(MAPPING.values()), dtype=np.int32).reshape(-1, 2)
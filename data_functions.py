@@ -9,13 +9,14 @@ This Python module contains functions that load and manipulate fire season data.
   - extrapolate_acreages
   - predict_next_top_five
   - predict_next_five_counties
-  - predict_cause
+  - predict_causes
 =======================================================================================
 Copyright (c) 2020 Andy Wang
 """
-import random
-from typing import Dict, List
-from scrollable_classes import *
+from collections import defaultdict
+from typing import Dict, List, Tuple
+import numpy as np
+from fire_classes import CaliFire, CaliFireSeason
 
 
 def get_fire_data(filename: str) -> Dict[int, CaliFireSeason]:
@@ -34,13 +35,13 @@ def get_fire_data(filename: str) -> Dict[int, CaliFireSeason]:
     # After that should be data about the fire season itself
     # Repeats for the next year
     with open(filename) as fire_data:
-        split_data = [row.split(',') for row in list(fire_data)]
         top_five_fires = []
         curr_year = None
-        for entry in split_data:
+        for row in fire_data:
+            entry = row.rstrip('\n').split(',')
             if len(entry) == 1:  # Introducing a year
                 curr_year = int(entry[0])
-            elif not entry[0].isnumeric():
+            elif not entry[0].isdigit():
                 # If the first element is name of a county, it's a CaliFire datatype
                 county = entry[0]
                 acreage = int(entry[1])
@@ -56,7 +57,8 @@ def get_fire_data(filename: str) -> Dict[int, CaliFireSeason]:
                                              acreage,
                                              top_five_fires)
                 data_so_far[curr_year] = fire_season
-                top_five_fires = []  # Reset the top five
+                # Reset the top five (the season keeps a reference to the old list)
+                top_five_fires = []
 
     return data_so_far
 
@@ -70,28 +72,41 @@ def predict_fire_season_data(seasons: Dict[int, CaliFireSeason], n: int) -> None
       - seasons != {}
       - n > 0
     """
-    all_years = [seasons[year].year for year in seasons]
-    all_num_fires = [seasons[year].fires for year in seasons]
-    all_acreage = [seasons[year].acreage for year in seasons]
+    all_years = []
+    all_num_fires = []
+    all_acreage = []
     all_counties = []
 
-    counties_causes = {}  # A dict that maps a county to all the causes of its fires
-    for year in seasons:
-        for fire in seasons[year].top_five:
+    # A dict that maps a county to all the causes of its fires
+    counties_causes = defaultdict(list)
+    for season in seasons.values():
+        all_years.append(season.year)
+        all_num_fires.append(season.fires)
+        all_acreage.append(season.acreage)
+        for fire in season.top_five:
             all_counties.append(fire.county)
-            if fire.county not in counties_causes:
-                counties_causes[fire.county] = []
             counties_causes[fire.county].append(fire.cause)
 
     # Predict the number of fires and acreages for the next n seasons using extrapolation
     next_fires = extrapolate_num_fires(all_years, all_num_fires, n)
     next_acreages = extrapolate_acreages(all_num_fires, all_acreage, next_fires)
 
+    # Convert to arrays once, so that numpy can sample from them directly
+    rng = np.random.default_rng()
+    counties_arr = np.array(all_counties)
+    counties_causes_arr = {county: np.array(causes)
+                           for county, causes in counties_causes.items()}
+
+    # Pick the counties and causes for all n seasons at once
+    all_five_counties = predict_next_five_counties(counties_arr, n, rng)
+    all_five_causes = predict_causes(all_five_counties, counties_causes_arr, rng)
+
     for i in range(1, n + 1):
         year = 2020 + i
         fires = next_fires[i - 1]
         acreage = next_acreages[i - 1]
-        top_five = predict_next_top_five(year, all_counties, counties_causes)
+        top_five = predict_next_top_five(year, all_five_counties[i - 1].tolist(),
+                                         all_five_causes[i - 1].tolist())
         seasons[year] = CaliFireSeason(year, fires, acreage, top_five)
 
 
@@ -102,38 +117,15 @@ def extrapolate_num_fires(years: List[int], fires: List[int], n: int) -> List[in
     Preconditions:
       - years != []
       - fires != []
+      - len(set(years)) > 1
       - n > 0
     """
-
-    def f(x: int) -> int:
-        """
-        This is the function to extrapolate data.
-        """
-        return int(a + x * b)
-
     # Perform linear extrapolation
     # years are the x value, and fires are the y value
-    avr_x = sum(years) / len(years)
-    avr_y = sum(fires) / len(fires)
-
-    b_numerator = sum(
-        (years[i] - avr_x) * (fires[i] - avr_y)
-        for i in range(len(fires))
-    )
-    b_denominator = sum(
-        (years[i] - avr_x) ** 2
-        for i in range(len(years))
-    )
-
-    b = b_numerator / b_denominator
-    a = avr_y - b * avr_x
-
-    fires_so_far = []
-    for i in range(1, n + 1):
-        year = 2020 + i
-        fires_so_far.append(f(year))
+    a, b = _linreg(years, fires)
 
-    return fires_so_far
+    next_years = np.arange(2021, 2021 + n)
+    return np.rint(a + b * next_years).astype(int).tolist()
 
 
 def extrapolate_acreages(fires: List[int], acreages: List[int], next_fires: List[int]) -> List[int]:
@@ -146,52 +138,56 @@ def extrapolate_acreages(fires: List[int], acreages: List[int], next_fires: List
     Preconditions:
       - fires != []
       - acreages != []
+      - len(set(fires)) > 1
       - next_fires != []
     """
+    # x is # of fires, y is acreage
+    a, b = _linreg(fires, acreages)
 
-    def f(x: int) -> int:
-        """
-        This is the function to extrapolate data.
-        """
-        return int(a + x * b)
+    next_fires_arr = np.asarray(next_fires, dtype=np.float64)
+    return np.rint(a + b * next_fires_arr).astype(int).tolist()
 
-    # x is years, y is acreage
-    avr_x = sum(fires) / len(fires)
-    avr_y = sum(acreages) / len(acreages)
 
-    b_numerator = sum(
-        (fires[i] - avr_x) * (acreages[i] - avr_y)
-        for i in range(len(fires))
-    )
-    b_denominator = sum(
-        (fires[i] - avr_x) ** 2
-        for i in range(len(fires))
-    )
+def _linreg(x_values: List[int], y_values: List[int]) -> Tuple[float, float]:
+    """
+    Return the intercept a and slope b of the line of best fit y = a + bx
+    through the given points, using the closed-form least squares solution.
 
-    b = b_numerator / b_denominator
-    a = avr_y - b * avr_x
+    Raise a ValueError if all the x values are equal, since there is no such line.
 
-    acreages_so_far = []
-    for fire in next_fires:
-        acreages_so_far.append(f(fire))
+    Preconditions:
+      - len(x_values) == len(y_values) > 1
+      - len(set(x_values)) > 1
+    """
+    xs = np.asarray(x_values, dtype=np.float64)
+    ys = np.asarray(y_values, dtype=np.float64)
+
+    # Deviations from the mean
+    x = xs - xs.mean()
+    y = ys - ys.mean()
+
+    x_spread = (x * x).sum()
+    if x_spread == 0:
+        raise ValueError("Cannot fit a line through points that all have the same x value")
+
+    b = (x * y).sum() / x_spread
+    a = ys.mean() - b * xs.mean()
 
-    return acreages_so_far
+    return a, b
 
 
-def predict_next_top_five(year: int, counties: List[str],
-                          counties_causes: Dict[str, List[str]]) -> List[CaliFire]:
+def predict_next_top_five(year: int, five_counties: List[str],
+                          five_causes: List[str]) -> List[CaliFire]:
     """
-    Given a future year, # of fires, and acreage, determine the top five fires for that year.
+    Given a future year, and the predicted counties and causes of its top five fires,
+    return the top five fires for that year.
 
     Preconditions:
-      - counties != []
+      - len(five_counties) == len(five_causes) == 5
     """
     top_five_so_far = []
-    five_counties = predict_next_five_counties(counties)
 
-    for county in five_counties:
-        causes = counties_causes[county]
-        cause = predict_cause(causes)
+    for county, cause in zip(five_counties, five_causes):
         top_five_so_far.append(CaliFire(year, county, 90000, cause, 32))
         # Acreage and structures_destroyed are dummy variables,
         # since these can't be accurately predicted
@@ -200,30 +196,43 @@ def predict_next_top_five(year: int, counties: List[str],
     return top_five_so_far
 
 
-def predict_next_five_counties(counties: List[str]) -> List[str]:
+def predict_next_five_counties(counties: np.ndarray, n: int,
+                               rng: np.random.Generator) -> np.ndarray:
     """
-    Given a list of all the counties whose fires were in a season's top five,
-    return five vulnerable counties.
+    Given an array of all the counties whose fires were in a season's top five,
+    return an n by 5 array of five vulnerable counties for each of the next n seasons.
 
-    A county can appear multiple times in the list, meaning it is more likely
+    A county can appear multiple times in the array, meaning it is more likely
     to be chosen (ie. vulnerable)
 
     Preconditions:
-      - counties != []
+      - counties.size > 0
+      - n > 0
     """
-    return [random.choice(counties) for _ in range(5)]
+    return rng.choice(counties, size=(n, 5))
 
 
-def predict_cause(causes: List[str]) -> str:
+def predict_causes(counties: np.ndarray, counties_causes: Dict[str, np.ndarray],
+                   rng: np.random.Generator) -> np.ndarray:
     """
-    Given a list of all the causes of fires for a certain county, randomly pick one.
+    Given an array of counties, return an array of the same shape where each county
+    is replaced by a cause randomly picked from all the causes of that county's fires.
 
     A cause can appear multiple times, making it more likely to be chosen (ie. likely)
 
     Preconditions:
-      - causes != []
+      - all(county in counties_causes for county in counties.flat)
+      - all(causes.size > 0 for causes in counties_causes.values())
     """
-    return random.choice(causes)
+    causes_so_far = np.empty(counties.shape, dtype=np.result_type(*counties_causes.values()))
+
+    # Pick the causes for every occurrence of the same county at once
+    for county in np.unique(counties):
+        positions = np.nonzero(counties == county)
+        causes_so_far[positions] = rng.choice(counties_causes[county],
+                                              size=positions[0].size)
+
+    return causes_so_far
 
 
 if __name__ == "__main__":
@@ -231,6 +240,6 @@ if __name__ == "__main__":
 
     python_ta.check_all(config={
         'max-line-length': 100,
-        'disable': ['R1705', 'C0200', 'W0401', 'E9999', 'E1101', 'E9998',
+        'disable': ['R1705', 'C0200', 'E9999', 'E1101', 'E9998',
                     'E9969', 'E9988', '']
     })
@@ -9,7 +9,7 @@ from dataclasses import dataclass
 from typing import List
 
 
-@dataclass
+@dataclass(frozen=True)
 class CaliFire:
     """
     A dataclass representing a single fire in California.
@@ -34,6 +34,9 @@ class CaliFire:
     >>> butte.cause == "Lightning"
     True
     """
+    # dataclass(slots=True) needs Python 3.10, so the slots are listed by hand
+    __slots__ = ('year', 'county', 'acreage', 'cause', 'structures_destroyed')
+
     year: int
     county: str
     acreage: int
@@ -41,7 +44,7 @@ class CaliFire:
     structures_destroyed: int
 
 
-@dataclass
+@dataclass(frozen=True)
 class CaliFireSeason:
     """
     A dataclass representing a California fire season.
@@ -72,6 +75,8 @@ class CaliFireSeason:
     >>> fire.acreage == 1593690
     True
     """
+    __slots__ = ('year', 'fires', 'acreage', 'top_five')
+
     year: int
     fires: int
     acreage: int
@@ -5,40 +5,64 @@ This Python module contains functions that display things on a pygame screen.
 
   - draw_scrollables
   - get_scrollables_for_season
+  - get_season_render_cache
+  - render_season_graph
   - display_season_data
   - get_counties_on_map
   - display_county_fire_info
   - scroll_objects
+  - get_fire_circle_bounds
   - get_mouse_on_fire_circle
   - draw_rect_outline
 =======================================================================================
 Copyright (c) 2020 Andy Wang
 """
-from typing import Optional, Dict
-from county_mapping import MAPPING
-from scrollable_classes import *
+import functools
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pygame
+from county_mapping import COUNTY_INDEX, MAPPING_ARR
+from fire_classes import CaliFire, CaliFireSeason
+from colour_fonts import CALIBRI_14_B, CALIBRI_24_B, WHITE, BLACK, RED, LIGHT_RED, \
+    ORANGE, LIGHT_ORANGE, LIGHT_BLUE
+from scrollable_classes import ScrollableObject, Image, FireCircle, TextLabel
 
 # Constants for the screen
 WIDTH = 800
 HEIGHT = 800
 
+# Constants for the fire season graph
+GRAPH_HORIZ_EDGE_OFFSET = 20  # Distance from edge of the screen horizontally
+GRAPH_VERT_EDGE_OFFSET = 10  # Distance from top of the screen
+GRAPH_SECTION_HEIGHT = 100  # the height of a section in pixels
+GRAPH_SECTION_OFFSET = 5  # gap between bar and the edge of the section
+# The total horizontal width of the entire graph
+GRAPH_TOTAL_WIDTH = WIDTH - (2 * GRAPH_HORIZ_EDGE_OFFSET)
+# The total vertical height of the entire graph
+GRAPH_HEIGHT = GRAPH_SECTION_HEIGHT + 3 * GRAPH_VERT_EDGE_OFFSET
+
 
 def draw_scrollables(screen: pygame.Surface, scrollables: List[ScrollableObject]) -> None:
     """
-    Draw all the provided drawable objects on the given screen.
+    Draw all the provided drawable objects on the given screen,
+    skipping the ones that are scrolled out of view.
 
     Preconditions:
       - scrollables != []
     """
+    view_rect = screen.get_rect()
     for scrollable in scrollables:
-        scrollable.draw(screen)
+        scrollable.draw_if_visible(screen, view_rect)
 
 
-def get_scrollables_for_season(season: CaliFireSeason,
-                               img_map: Image) -> List[ScrollableObject]:
+def get_scrollables_for_season(season: CaliFireSeason, img_map: Image) \
+        -> Tuple[List[ScrollableObject], List[FireCircle]]:
     """
     Given a season, return all the scrollables needed to
-    display the data for it.
+    display the data for it, with the fire circles returned separately
+    so that they can be drawn with FireCircle.draw_all.
     """
     season_text = f"Total # of fires: {season.fires}    " \
                   f"Total acreage burned: {season.acreage}"
@@ -58,85 +82,167 @@ def get_scrollables_for_season(season: CaliFireSeason,
 
     scrollables_so_far = [season_data_label, map_label, img_map]
     county_circles = get_counties_on_map(season, img_map)
-    scrollables_so_far += county_circles
-    return scrollables_so_far
+    return scrollables_so_far, county_circles
 
 
-def display_season_data(screen: pygame.Surface, seasons: Dict[int, CaliFireSeason],
-                        current_index: int) -> None:
+@dataclass
+class SeasonRenderCache:
     """
-    Display the # of fires and acreage data for the fire seasons
-    on the top of the screen.
-
-    The season at current_index is highlighted, since it is the
-    season that the user is focusing on.
+    A dataclass holding the values needed to draw the fire season graph,
+    which never change once all the fire season data has been loaded and predicted.
+
+    Instance Attributes:
+      - years: the year of every fire season, in order
+      - all_num_fires: the # of fires of every fire season, in order
+      - all_acreage: the acreage burned in every fire season, in order
+      - max_num_fires: the largest # of fires out of all the seasons
+      - max_acreage: the largest acreage out of all the seasons
+      - section_width: the width in pixels of the graph section for each season
+      - year_label_y: the y-coordinate of the year labels below the bars
+      - highlights: the rectangle to highlight each season's section with
+      - red_bars: the rectangle of each season's # of fires bar
+      - orange_bars: the rectangle of each season's acreage bar
+
+    Representation Invariants:
+      - len(self.years) == len(self.all_num_fires) == len(self.all_acreage)
+      - self.section_width > 0
+    """
+    years: Tuple[int, ...]
+    all_num_fires: Tuple[int, ...]
+    all_acreage: Tuple[int, ...]
+    max_num_fires: int
+    max_acreage: int
+    section_width: float
+    year_label_y: float
+    highlights: Tuple[pygame.Rect, ...]
+    red_bars: Tuple[pygame.Rect, ...]
+    orange_bars: Tuple[pygame.Rect, ...]
+
+
+def get_season_render_cache(seasons: Dict[int, CaliFireSeason]) -> SeasonRenderCache:
+    """
+    Compute all the values needed by display_season_data for the given fire seasons.
 
     Preconditions:
       - seasons != {}
-      - 0 <= current_index < len(seasons)
     """
-    seasons_list = [seasons[s] for s in seasons]
-    years = list(seasons.keys())
+    years = tuple(seasons.keys())
+    all_num_fires = tuple(season.fires for season in seasons.values())
+    all_acreage = tuple(season.acreage for season in seasons.values())
+
+    section_width = GRAPH_TOTAL_WIDTH / len(seasons)
+    # two bars in each section
+    bar_width = (section_width - 2 * GRAPH_SECTION_OFFSET) / 2
+
+    # Scale the bars so that the highest one takes up the whole section
+    max_bar_height = GRAPH_SECTION_HEIGHT - GRAPH_VERT_EDGE_OFFSET
+    fires_arr = np.asarray(all_num_fires, dtype=np.float64)
+    acreage_arr = np.asarray(all_acreage, dtype=np.float64)
+    red_bar_heights = (fires_arr / fires_arr.max() * max_bar_height).astype(int)
+    orange_bar_heights = (acreage_arr / acreage_arr.max() * max_bar_height).astype(int)
+
+    # Make all the bars stand on the same level
+    red_bar_ys = GRAPH_SECTION_HEIGHT - red_bar_heights + GRAPH_VERT_EDGE_OFFSET
+    orange_bar_ys = GRAPH_SECTION_HEIGHT - orange_bar_heights + GRAPH_VERT_EDGE_OFFSET
+
+    red_bar_heights = red_bar_heights.tolist()
+    orange_bar_heights = orange_bar_heights.tolist()
+    red_bar_ys = red_bar_ys.tolist()
+    orange_bar_ys = orange_bar_ys.tolist()
+
+    # All the bars stand on the same level, so the year labels all go just below it
+    year_label_y = GRAPH_SECTION_HEIGHT + GRAPH_VERT_EDGE_OFFSET + GRAPH_SECTION_OFFSET / 2
+
+    # The rectangles never move, so create them all once here
+    highlights = []
+    red_bars = []
+    orange_bars = []
+    for x in range(len(years)):
+        # x-coordinate of the section
+        section_x = GRAPH_HORIZ_EDGE_OFFSET + x * section_width
+
+        # red bar is # of fires, orange is acreage
+        red_bar_x = section_x + GRAPH_SECTION_OFFSET
+        orange_bar_x = red_bar_x + bar_width
 
-    horiz_edge_offset = 20  # Distance from edge of the screen horizontally
-    vert_edge_offset = 10  # Distance from top of the screen
-    section_height = 100  # the height of a section in pixels
+        highlights.append(pygame.Rect(section_x, 0, section_width, GRAPH_HEIGHT))
+        red_bars.append(pygame.Rect(red_bar_x, red_bar_ys[x], bar_width, red_bar_heights[x]))
+        orange_bars.append(pygame.Rect(orange_bar_x, orange_bar_ys[x],
+                                       bar_width, orange_bar_heights[x]))
 
-    # The total horizontal width of the entire graph
-    total_width = WIDTH - (2 * horiz_edge_offset)
+    return SeasonRenderCache(years, all_num_fires, all_acreage,
+                             max(all_num_fires), max(all_acreage),
+                             section_width, year_label_y,
+                             tuple(highlights), tuple(red_bars), tuple(orange_bars))
 
-    section_width = total_width / len(seasons)
-    section_offset = 5  # gap between bar and the edge of the section
-    bar_width = (section_width - 2 * section_offset) / 2  # two bars in each section
 
-    all_num_fires = [season.fires for season in seasons_list]
-    all_acreage = [season.acreage for season in seasons_list]
-    max_num_fires = max(all_num_fires)
-    max_acreage = max(all_acreage)
+def render_season_graph(graph: SeasonRenderCache, current_index: int) -> pygame.Surface:
+    """
+    Return a surface as wide as the screen with the fire season graph drawn on it,
+    to be blitted at the top of the screen.
 
-    # Draw the background for the graph
-    background = pygame.Rect(0, 0, total_width, section_height + 3 * vert_edge_offset)
-    pygame.draw.rect(screen, WHITE, background)
+    The graph only changes when current_index does, so the returned surface can be
+    reused until then.
 
-    # Initialize fonts
-    font = CALIBRI_14_B
-    num_fires_text = font.render("# of Fires", True, RED)
-    num_fires_text = pygame.transform.rotate(num_fires_text, 90)
+    Preconditions:
+      - 0 <= current_index < len(graph.years)
+      - the pygame display has been initialized
+    """
+    # Match the display's pixel format, so that blitting the graph is just a copy
+    graph_surface = pygame.Surface((WIDTH, GRAPH_HEIGHT)).convert()
+    graph_surface.fill(WHITE)
+    display_season_data(graph_surface, graph, current_index)
+    return graph_surface
+
+
+def display_season_data(screen: pygame.Surface, graph: SeasonRenderCache,
+                        current_index: int) -> None:
+    """
+    Display the # of fires and acreage data for the fire seasons
+    on the top of the screen.
+
+    The season at current_index is highlighted, since it is the
+    season that the user is focusing on.
+
+    The graph has no background of its own, so the area it is drawn on
+    should already be white (see render_season_graph).
+
+    Preconditions:
+      - 0 <= current_index < len(graph.years)
+    """
+    years = graph.years
+    all_num_fires = graph.all_num_fires
+    all_acreage = graph.all_acreage
+    max_num_fires = graph.max_num_fires
+    max_acreage = graph.max_acreage
+    section_width = graph.section_width
+
+    horiz_edge_offset = GRAPH_HORIZ_EDGE_OFFSET
+    vert_edge_offset = GRAPH_VERT_EDGE_OFFSET
+    section_height = GRAPH_SECTION_HEIGHT
+
+    # Label the axes
+    num_fires_text = _render_text("# of Fires", RED, 90)
     screen.blit(num_fires_text, (horiz_edge_offset / 4,
                                  section_height / 2 - vert_edge_offset))
 
-    acreage_text = font.render("Acreage", True, ORANGE)
-    acreage_text = pygame.transform.rotate(acreage_text, 90)
+    acreage_text = _render_text("Acreage", ORANGE, 90)
     screen.blit(acreage_text, (WIDTH - horiz_edge_offset,
                                section_height / 2 - vert_edge_offset))
 
-    for x in range(len(seasons)):
+    for x, (year, num_fires, acreage) in enumerate(zip(years, all_num_fires, all_acreage)):
         # x-coordinate of the section
         section_x = horiz_edge_offset + x * section_width
 
         # red bar is # of fires, orange is acreage
-        red_bar_x = section_x + section_offset
-        orange_bar_x = red_bar_x + bar_width
-
-        red_bar_height = int((all_num_fires[x] / max_num_fires)
-                             * (section_height - vert_edge_offset))
-        orange_bar_height = int((all_acreage[x] / max_acreage)
-                                * (section_height - vert_edge_offset))
-
-        # Make all the bars stand on the same level
-        red_bar_y = section_height - red_bar_height + vert_edge_offset
-        orange_bar_y = section_height - orange_bar_height + vert_edge_offset
+        red_bar = graph.red_bars[x]
+        orange_bar = graph.orange_bars[x]
 
         # Draw the stuff
         if x == current_index:
-            highlight = pygame.Rect(section_x, 0, section_width,
-                                    section_height + 3 * vert_edge_offset)
-            pygame.draw.rect(screen, LIGHT_BLUE, highlight)
-
-        red_bar = pygame.Rect(red_bar_x, red_bar_y, bar_width, red_bar_height)
-        orange_bar = pygame.Rect(orange_bar_x, orange_bar_y, bar_width, orange_bar_height)
+            pygame.draw.rect(screen, LIGHT_BLUE, graph.highlights[x])
 
-        if years[x] > 2020:
+        if year > 2020:
             pygame.draw.rect(screen, LIGHT_RED, red_bar)
             pygame.draw.rect(screen, LIGHT_ORANGE, orange_bar)
         else:
@@ -144,19 +250,33 @@ def display_season_data(screen: pygame.Surface, seasons: Dict[int, CaliFireSeaso
             pygame.draw.rect(screen, ORANGE, orange_bar)
 
         # Draw the bar's text
-        year_text = font.render(str(years[x]), True, BLACK)
-        text_width = font.size(str(years[x]))[0]
+        year_text = _render_text(str(year), BLACK)
+        text_width = year_text.get_width()
         screen.blit(year_text, ((section_x + section_width / 2) - text_width / 2,
-                                red_bar_y + red_bar_height + section_offset / 2))
+                                graph.year_label_y))
 
         # A bar with a border in it means it's the highest
-        if all_num_fires[x] == max_num_fires:
+        if num_fires == max_num_fires:
             draw_rect_outline(screen, red_bar, BLACK, 3)
 
-        if all_acreage[x] == max_acreage:
+        if acreage == max_acreage:
             draw_rect_outline(screen, orange_bar, BLACK, 3)
 
 
+@functools.lru_cache(maxsize=256)
+def _render_text(text: str, colour: Tuple[int, int, int], angle: int = 0) -> pygame.Surface:
+    """
+    Return the text rendered in CALIBRI_14_B with the given colour, rotated by angle degrees.
+
+    The rendered surfaces are cached, since the same text is drawn every frame.
+    Do not draw onto the returned surface.
+    """
+    text_surface = CALIBRI_14_B.render(text, True, colour)
+    if angle != 0:
+        text_surface = pygame.transform.rotate(text_surface, angle)
+    return text_surface
+
+
 def get_counties_on_map(season: CaliFireSeason, img_map: Image) -> List[FireCircle]:
     """
     Add circles to the list of scrollables, that each represent a single county fire.
@@ -166,18 +286,16 @@ def get_counties_on_map(season: CaliFireSeason, img_map: Image) -> List[FireCirc
     circles_so_far = []
     # The fact that a county can have multiple fires makes this a bit more complicated
     # Make a dictionary that maps a county name to a list of fires there
-    fire_dict = {}
+    fire_dict = defaultdict(list)
     for fire in season.top_five:
-        if fire.county not in fire_dict:
-            fire_dict[fire.county] = []
         fire_dict[fire.county].append(fire)
 
-    for county in fire_dict:
-        x1, y1 = MAPPING[county]
-        x2, y2 = img_map.get_coords()
+    # Offset the counties' coordinates on the map by where the map is
+    indices = [COUNTY_INDEX[county] for county in fire_dict]
+    coords = MAPPING_ARR[indices] + np.array(img_map.get_coords())
 
-        fires = fire_dict[county]
-        circles_so_far.append(FireCircle(x1 + x2, y1 + y2, fires))
+    for (x, y), fires in zip(coords.tolist(), fire_dict.values()):
+        circles_so_far.append(FireCircle(x, y, fires))
 
     return circles_so_far
 
@@ -187,7 +305,24 @@ def display_county_fire_info(screen: pygame.Surface, circle: FireCircle) -> None
     When the mouse is hovering over a fire circle, display data about
     all the fires that happened in that county, within the current season's top five.
     """
-    fires = circle.get_fires()
+    # The fires in a circle never change, so only render their info once
+    if circle.info_surface is None:
+        circle.info_surface = _render_fire_info(circle.get_fires())
+
+    x, y = circle.get_coords()
+    screen.blit(circle.info_surface, (x, y))
+
+    display_rect = circle.info_surface.get_rect(topleft=(x, y))
+    draw_rect_outline(screen, display_rect, BLACK, 1)
+
+
+def _render_fire_info(fires: Tuple[CaliFire, ...]) -> pygame.Surface:
+    """
+    Return a surface displaying data about all the given fires, one below the other.
+
+    Preconditions:
+      - fires != ()
+    """
     year = fires[0].year
     width = 200
     height_per_fire = 90  # Each fire that happens at a county is given this many pixels vertically
@@ -196,20 +331,18 @@ def display_county_fire_info(screen: pygame.Surface, circle: FireCircle) -> None
     if year > 2020:
         height_per_fire = 45
 
-    x, y = circle.get_coords()
     edge_offset = width / 25
     text_gap = 20
 
-    display_rect = pygame.Rect(x, y, width, height_per_fire * len(fires))
-
-    pygame.draw.rect(screen, WHITE, display_rect)
+    info_surface = pygame.Surface((width, height_per_fire * len(fires)))
+    info_surface.fill(WHITE)
 
     font = CALIBRI_14_B
     for i, fire in enumerate(fires):
-        height = y + i * height_per_fire
+        height = i * height_per_fire
         if i >= 1:
-            pygame.draw.line(screen, BLACK,
-                             (x, height), (x + width, height), 1)
+            pygame.draw.line(info_surface, BLACK,
+                             (0, height), (width, height), 1)
         county = fire.county
         acreage = str(fire.acreage)
         cause = fire.cause
@@ -218,21 +351,19 @@ def display_county_fire_info(screen: pygame.Surface, circle: FireCircle) -> None
         first_line_y = height + edge_offset
 
         if year > 2020:
-            screen.blit(font.render(f"County: {county}", True, BLACK),
-                        (x + edge_offset, first_line_y))
-            screen.blit(font.render(f"Most Likely Cause: {cause}", True, BLACK),
-                        (x + edge_offset, first_line_y + text_gap))
+            lines = [f"County: {county}",
+                     f"Most Likely Cause: {cause}"]
         else:
-            screen.blit(font.render(f"County: {county}", True, BLACK),
-                        (x + edge_offset, first_line_y))
-            screen.blit(font.render(f"Acreage: {acreage}", True, BLACK),
-                        (x + edge_offset, first_line_y + text_gap))
-            screen.blit(font.render(f"Cause: {cause}", True, BLACK),
-                        (x + edge_offset, first_line_y + 2 * text_gap))
-            screen.blit(font.render(f"Structures destroyed: {destroyed}", True, BLACK),
-                        (x + edge_offset, first_line_y + 3 * text_gap))
+            lines = [f"County: {county}",
+                     f"Acreage: {acreage}",
+                     f"Cause: {cause}",
+                     f"Structures destroyed: {destroyed}"]
 
-    draw_rect_outline(screen, display_rect, BLACK, 1)
+        for j, line in enumerate(lines):
+            info_surface.blit(font.render(line, True, BLACK),
+                              (edge_offset, first_line_y + j * text_gap))
+
+    return info_surface
 
 
 def scroll_objects(scrollables: List[ScrollableObject], scroll_amount: int) -> None:
@@ -249,23 +380,50 @@ def scroll_objects(scrollables: List[ScrollableObject], scroll_amount: int) -> N
         scrollable.translate(0, scroll_amount)
 
 
-def get_mouse_on_fire_circle(x: int, y: int,
-                             scrollables: List[ScrollableObject]) -> Optional[FireCircle]:
+def get_fire_circle_bounds(circles: List[FireCircle]) -> np.ndarray:
+    """
+    Return an array with one row (x, y, width, height) for the bounds of each circle,
+    in the same order as circles.
+
+    The array must be translated along with the circles when they are scrolled.
+    """
+    bounds = [circle.get_bounds() for circle in circles]
+    return np.array(bounds, dtype=np.float32).reshape(-1, 4)
+
+
+def get_mouse_on_fire_circle(x: int, y: int, bounds: np.ndarray,
+                             circles: List[FireCircle]) -> Optional[FireCircle]:
     """
     Return whether the coords (x, y) are in a fire circle, and
     return that circle if yes.
 
+    bounds holds the bounds of each circle, as returned by get_fire_circle_bounds.
+
     Preconditions:
-      - scrollables != []
+      - len(bounds) == len(circles)
     """
-    for scrollable in scrollables:
-        if isinstance(scrollable, FireCircle):
-            cx, cy, w, h = scrollable.get_bounds()
+    i = _hit_index(bounds, x, y)
+
+    if i == -1:
+        return None
+    return circles[i]
+
 
-            if (cx < x < cx + w) and (cy < y < cy + h):
-                return scrollable
+def _hit_index(bounds: np.ndarray, x: int, y: int) -> int:
+    """
+    Return the index of the first row (x, y, width, height) of bounds that
+    strictly contains the point (x, y), or -1 if there isn't one.
+    """
+    top_left = bounds[:, :2]
+    point = np.array((x, y), dtype=bounds.dtype)
 
-    return None
+    # Compare the x and y coordinates of every row at once
+    inside = (top_left < point) & (point < top_left + bounds[:, 2:])
+    hits = np.flatnonzero(inside.all(axis=1))
+
+    if hits.size == 0:
+        return -1
+    return int(hits[0])
 
 
 def draw_rect_outline(screen: pygame.Surface, rect: pygame.Rect,
@@ -274,19 +432,8 @@ def draw_rect_outline(screen: pygame.Surface, rect: pygame.Rect,
     Draw an outline around the given rectangle, given that the rectangle
     is drawn before this functio is called.
     """
-    x = rect.x
-    y = rect.y
-    w = rect.width
-    h = rect.height
-
-    # Top border
-    pygame.draw.line(screen, colour, (x, y), (x + w, y), thickness)
-    # Bottom line
-    pygame.draw.line(screen, colour, (x, y + h), (x + w, y + h), thickness)
-    # Left border
-    pygame.draw.line(screen, colour, (x, y), (x, y + h), thickness)
-    # Right border
-    pygame.draw.line(screen, colour, (x + w, y), (x + w, y + h), thickness)
+    # A positive width makes pygame only draw the border of the rectangle
+    pygame.draw.rect(screen, colour, rect, thickness)
 
 
 if __name__ == "__main__":
@@ -294,6 +441,6 @@ if __name__ == "__main__":
 
     python_ta.check_all(config={
         'max-line-length': 100,
-        'disable': ['R1705', 'C0200', 'W0401', 'E9999', 'E1101', 'E9998',
+        'disable': ['R1705', 'C0200', 'E9999', 'E1101', 'E9998',
                     'E9969', 'E9988', 'R0914']
     })
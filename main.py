@@ -20,12 +20,15 @@ from colour_fonts import *
 FUTURE_YEARS = 10  # Predict this many years into the future
 SCROLL_SPEED = 15  # The num of pixels each scroll is
 MAX_SCROLL = 600  # The limit of pixels you can scroll down for
+FPS = 60  # The maximum number of frames per second
 
 if __name__ == "__main__":
     # Load all the data
     fire_season_data = get_fire_data("cali_fire_data.txt")
     predict_fire_season_data(fire_season_data, FUTURE_YEARS)
-    years = list(fire_season_data.keys())
+    seasons_list = tuple(fire_season_data.values())
+    # The data never changes from here on, so only compute the graph's values once
+    season_graph = get_season_render_cache(fire_season_data)
 
     # Main loop variable
     running = True
@@ -36,11 +39,21 @@ if __name__ == "__main__":
 
     initial_map_coords = (190, 240)
     mapx, mapy = initial_map_coords
-    scrollables = get_scrollables_for_season(fire_season_data[years[0]],
-                                             Image(mapx, mapy, "county_map.jpg"))
+    # Load the map only once, since decoding the image is expensive
+    county_map = Image(mapx, mapy, "county_map.jpg")
+    scrollables, fire_circles = get_scrollables_for_season(seasons_list[0], county_map)
+    circle_bounds = get_fire_circle_bounds(fire_circles)
     scroll_amount = 0
     curr_index = 0
 
+    # The graph is drawn on its own surface, and only redrawn when the season changes
+    graph_surface = render_season_graph(season_graph, curr_index)
+
+    clock = pygame.time.Clock()
+    # Only redraw the screen when something on it has changed
+    dirty = True
+    specific_fire = None
+
     # Start the main pygame loop
     while running:
         # Get the user's mouse coordinates
@@ -69,7 +82,10 @@ if __name__ == "__main__":
 
                 if 0 <= scroll_amount - scroll_translate <= MAX_SCROLL:
                     scroll_objects(scrollables, scroll_translate)
+                    scroll_objects(fire_circles, scroll_translate)
+                    circle_bounds[:, 1] += scroll_translate  # keep the bounds in sync
                     scroll_amount -= scroll_translate
+                    dirty = True
 
                     # If scroll_translate is positive,
                     # then you are scrolling back up (undoing your scroll)
@@ -85,19 +101,35 @@ if __name__ == "__main__":
                 elif event.key == pygame.K_LEFT:
                     curr_index -= 1
                     curr_index %= len(fire_season_data)
-                scrollables = get_scrollables_for_season(fire_season_data[years[curr_index]],
-                                                         Image(mapx, mapy, "county_map.jpg"))
+                county_map.move_to(mapx, mapy)  # undo any scrolling done to the map
+                scrollables, fire_circles = get_scrollables_for_season(
+                    seasons_list[curr_index], county_map)
+                circle_bounds = get_fire_circle_bounds(fire_circles)
+                graph_surface = render_season_graph(season_graph, curr_index)
                 scroll_amount = 0  # reset the scroll amount
-
-        specific_fire = get_mouse_on_fire_circle(mouse_x, mouse_y, scrollables)
-
-        # Draw everything
-        screen.fill(WHITE)
-        draw_scrollables(screen, scrollables)
-
-        if specific_fire is not None:
-            display_county_fire_info(screen, specific_fire)
-        display_season_data(screen, fire_season_data, curr_index)
-
-        pygame.display.flip()
+                dirty = True
+            if event.type == pygame.VIDEOEXPOSE:
+                # The window needs to be repainted
+                dirty = True
+
+        hovered_fire = get_mouse_on_fire_circle(mouse_x, mouse_y, circle_bounds, fire_circles)
+        if hovered_fire is not specific_fire:
+            # The mouse entered or left a fire circle
+            specific_fire = hovered_fire
+            dirty = True
+
+        if dirty:
+            # Draw everything
+            screen.fill(WHITE)
+            draw_scrollables(screen, scrollables)
+            FireCircle.draw_all(screen, fire_circles)
+
+            if specific_fire is not None:
+                display_county_fire_info(screen, specific_fire)
+            screen.blit(graph_surface, (0, 0))
+
+            pygame.display.flip()
+            dirty = False
+
+        clock.tick(FPS)
     pygame.display.quit()
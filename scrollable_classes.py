@@ -9,10 +9,19 @@ and its concrete subclasses:
 ========================================================================================
 Copyright (c) 2020 Andy Wang
 """
+from __future__ import annotations
 
-from typing import Tuple
-from fire_classes import *
-from colour_fonts import *
+import bisect
+from typing import Optional
+import pygame
+from fire_classes import CaliFire
+from colour_fonts import CALIBRI_14_B, BLACK, YELLOW, ORANGE, RED, LIGHT_RED
+
+# Acreage bounds, in increasing order, and the colour and radius of a FireCircle
+# whose acreage is at least that bound
+ACREAGE_BOUNDS = (0, 10000, 20000, 40000, 60000, 80000, 100000)
+ACREAGE_STYLES = ((YELLOW, 10), (YELLOW, 12), (YELLOW, 15), (ORANGE, 18),
+                  (ORANGE, 20), (RED, 22), (RED, 25))
 
 
 class ScrollableObject:
@@ -23,9 +32,19 @@ class ScrollableObject:
     # Private Instance Attributes:
     #   - _x: the x coordinate of the object
     #   - _y: the y coordinate of the object
+    #   - _pos: the tuple (_x, _y), kept so that drawing doesn't need to build a new one
+    #   - _rect: the area the object takes up on the screen, or None if it
+    #            hasn't been computed since the object last moved
     # Note: The coordinates are either top-left or the centre, depending on the object
+
+    # Representation Invariants:
+    #   - self._pos == (self._x, self._y)
+    __slots__ = ('_x', '_y', '_pos', '_rect')
+
     _x: int
     _y: int
+    _pos: tuple[int, int]
+    _rect: Optional[pygame.Rect]
 
     def __init__(self, x: int, y: int) -> None:
         """
@@ -33,25 +52,44 @@ class ScrollableObject:
         """
         self._x = x
         self._y = y
+        self._pos = (x, y)
+        self._rect = None
 
-    def get_coords(self) -> Tuple[int, int]:
+    def get_coords(self) -> tuple[int, int]:
         """
         Return the coordinates of this object.
         """
-        return (self._x, self._y)
+        return self._pos
 
     def translate(self, dx: int, dy: int) -> None:
         """
         Translate the object's coordinates.
         """
-        self._x += dx
-        self._y += dy
+        self.move_to(self._x + dx, self._y + dy)
 
     def move_to(self, x: int, y: int) -> None:
         """
         Move the coordinates to the given ones.
         """
         self._x, self._y = x, y
+        self._pos = (x, y)
+        self._rect = None
+
+    def get_rect(self) -> pygame.Rect:
+        """
+        Return the area that this object takes up on the screen.
+
+        The rectangle is reused until the object moves, so don't mutate it.
+        """
+        if self._rect is None:
+            self._rect = self._make_rect()
+        return self._rect
+
+    def _make_rect(self) -> pygame.Rect:
+        """
+        Return a new rectangle of the area that this object takes up on the screen.
+        """
+        raise NotImplementedError
 
     def draw(self, screen: pygame.Surface) -> None:
         """
@@ -59,6 +97,13 @@ class ScrollableObject:
         """
         raise NotImplementedError
 
+    def draw_if_visible(self, screen: pygame.Surface, view_rect: pygame.Rect) -> None:
+        """
+        Draw the object on the screen, but only if it is at least partly inside view_rect.
+        """
+        if view_rect.colliderect(self.get_rect()):
+            self.draw(screen)
+
 
 class Image(ScrollableObject):
     """
@@ -70,7 +115,15 @@ class Image(ScrollableObject):
     """
     # Private Instance Attributes:
     #   - _image: the image to draw
+    #   - _converted: whether _image has been converted to the display's pixel format
+    #   - _w: the width in pixels of _image
+    #   - _h: the height in pixels of _image
+    __slots__ = ('_image', '_converted', '_w', '_h')
+
     _image: pygame.Surface
+    _converted: bool
+    _w: int
+    _h: int
 
     def __init__(self, x: int, y: int, filename: str) -> None:
         """
@@ -81,30 +134,62 @@ class Image(ScrollableObject):
         """
         super().__init__(x, y)
         self._image = pygame.image.load(filename)
+        self._w, self._h = self._image.get_size()
+        self._converted = False
+        self._convert_image()
+
+    def _convert_image(self) -> None:
+        """
+        Convert the image to the display's pixel format, so that blitting it
+        doesn't need to convert every pixel each time.
+
+        Do nothing if the display hasn't been set up yet.
+        """
+        try:
+            if self._image.get_alpha() is not None:
+                self._image = self._image.convert_alpha()
+            else:
+                self._image = self._image.convert()
+            self._converted = True
+        except pygame.error:
+            # There is no display to convert to yet, so try again when drawing
+            pass
 
     def draw(self, screen: pygame.Surface) -> None:
         """
         Draw the image on the screen.
         """
-        screen.blit(self._image, (self._x, self._y))
+        if not self._converted:
+            self._convert_image()
+        screen.blit(self._image, self._pos)
+
+    def _make_rect(self) -> pygame.Rect:
+        """
+        Return a new rectangle of the area that this image takes up on the screen.
+        """
+        return pygame.Rect(self._pos, (self._w, self._h))
 
     def get_width(self) -> int:
         """
         Return the width in pixels of this image.
         """
-        return self._image.get_width()
+        return self._w
 
     def get_height(self) -> int:
         """
         Return the height in pixels of this image.
         """
-        return self._image.get_height()
+        return self._h
 
 
 class FireCircle(ScrollableObject):
     """
     A class representing a single county fire visually with a circle.
 
+    Instance Attributes:
+      - info_surface: the rendered info about this circle's fires, or None if it
+        hasn't been rendered yet
+
     >>> from fire_classes import CaliFire
     >>> fire = CaliFire(2000, "County", 999, "You", 0)
     >>> circle = FireCircle(0, 0, [fire])
@@ -115,25 +200,37 @@ class FireCircle(ScrollableObject):
     #   - _year: the year of the fires
     #   - _county: the county that the fire takes place in, as a string
     #   - _acreage: the acreage of the fire
-    #   - _fires: a list of all the fires that happened in this county, within the season's top five
-    #             in order from most to least acreage
+    #   - _fires: a tuple of all the fires that happened in this county,
+    #             within the season's top five in order from most to least acreage
     #   - _radius: the radius of the circle
     #   - _colour: the colour of the circle
+    #   - _text_surface: the county's name, rendered once since it never changes
+    #   - _text_offset: where to draw _text_surface relative to the centre, to centre it
+    #   - _text_pos: where to draw _text_surface on the screen
+    #   - _bounds: the top-left coordinates and dimensions of the square this circle takes up
 
     # Representation Invariants:
     #   - self._county != ""
     #   - self._acreage > 0
-    #   - self._fires != []
+    #   - self._fires != ()
     #   - self._radius > 0
     #   - all(0 <= n <= 255 for n in self._colour)
 
+    __slots__ = ('_county', '_acreage', '_fires', '_radius', '_colour',
+                 '_text_surface', '_text_offset', '_text_pos', '_bounds', 'info_surface')
+
     _county: str
     _acreage: int
-    _fires: List[CaliFire]
+    _fires: tuple[CaliFire, ...]
     _radius: int
-    _colour: Tuple[int, int, int]
+    _colour: tuple[int, int, int]
+    _text_surface: pygame.Surface
+    _text_offset: tuple[int, int]
+    _text_pos: tuple[int, int]
+    _bounds: tuple[int, int, int, int]
+    info_surface: Optional[pygame.Surface]
 
-    def __init__(self, x: int, y: int, fires: List[CaliFire]) -> None:
+    def __init__(self, x: int, y: int, fires: list[CaliFire]) -> None:
         """
         Create a FireCircle that represents all the fires that happened at a county,
         but only in the season's top five fires.
@@ -144,7 +241,13 @@ class FireCircle(ScrollableObject):
         super().__init__(x, y)
         self._county = fires[0].county  # they should all have the same county
         self._acreage = 0
-        self._fires = fires
+        self._fires = tuple(fires)
+        self.info_surface = None
+
+        self._text_surface = CALIBRI_14_B.render(self._county, True, BLACK)
+        self._text_offset = (-self._text_surface.get_width() // 2,
+                             -self._text_surface.get_height() // 2)
+        self._text_pos = (x + self._text_offset[0], y + self._text_offset[1])
 
         if fires[0].year > 2020:
             self._colour = LIGHT_RED
@@ -154,53 +257,75 @@ class FireCircle(ScrollableObject):
             # when it is in the top five
         else:
             # Accumulate total acreage in the county - only for drawing purposes
-            for fire in fires:
-                self._acreage += fire.acreage
-
-            # Dictionary of acreage bounds to colour and radius of circle
-            bounds = {
-                0: (YELLOW, 10),
-                10000: (YELLOW, 12),
-                20000: (YELLOW, 15),
-                40000: (ORANGE, 18),
-                60000: (ORANGE, 20),
-                80000: (RED, 22),
-                100000: (RED, 25),
-            }
-
-            for bound in bounds:
-                if self._acreage >= bound:
-                    self._colour, self._radius = bounds[bound]
+            self._acreage = sum(fire.acreage for fire in self._fires)
+
+            # Use the style of the largest acreage bound that the acreage reaches
+            i = bisect.bisect_right(ACREAGE_BOUNDS, self._acreage) - 1
+            self._colour, self._radius = ACREAGE_STYLES[i]
+
+        self._bounds = self._compute_bounds()
 
     def draw(self, screen: pygame.Surface) -> None:
         """
         Draw the circle that represents this fire.
         """
+        pygame.draw.circle(screen, self._colour, self._pos, self._radius)
+        screen.blit(self._text_surface, self._text_pos)
 
-        font = CALIBRI_14_B
-
-        pygame.draw.circle(screen, self._colour, self.get_coords(), self._radius)
+    def move_to(self, x: int, y: int) -> None:
+        """
+        Move the coordinates to the given ones, along with the county's name.
+        """
+        super().move_to(x, y)
+        self._text_pos = (x + self._text_offset[0], y + self._text_offset[1])
+        self._bounds = self._compute_bounds()
 
-        width, height = font.size(self._county)
-        text = font.render(self._county, True, BLACK)
-        screen.blit(text, (self._x - width / 2, self._y - height / 2))
+    def _make_rect(self) -> pygame.Rect:
+        """
+        Return a new rectangle of the square that this circle takes up on the screen.
+        """
+        return pygame.Rect(self._bounds)
 
-    def get_bounds(self) -> Tuple[int, int, int, int]:
+    def get_bounds(self) -> tuple[int, int, int, int]:
         """
         Return coordinates and dimensions of the square that this circle takes up.
         """
-        # Top-let coordinates
+        return self._bounds
+
+    def _compute_bounds(self) -> tuple[int, int, int, int]:
+        """
+        Compute the coordinates and dimensions of the square that this circle takes up.
+        """
+        # Top-left coordinates
         x = self._x - self._radius
         y = self._y - self._radius
+        diameter = self._radius * 2
 
-        return (x, y, self._radius * 2, self._radius * 2)
+        return (x, y, diameter, diameter)
 
-    def get_fires(self) -> List[CaliFire]:
+    def get_fires(self) -> tuple[CaliFire, ...]:
         """
         Return all the county fires that this class is associated with.
         """
         return self._fires
 
+    @staticmethod
+    def draw_all(screen: pygame.Surface, circles: list[FireCircle]) -> None:
+        """
+        Draw all the given fire circles on the screen, skipping the ones that are
+        scrolled out of view.
+
+        This does the same as calling draw_if_visible on each circle, but with the
+        pygame functions looked up only once instead of once per circle.
+        """
+        view_rect = screen.get_rect()
+        draw_circle = pygame.draw.circle
+        blit = screen.blit
+        for circle in circles:
+            if view_rect.colliderect(circle.get_rect()):
+                draw_circle(screen, circle._colour, circle._pos, circle._radius)
+                blit(circle._text_surface, circle._text_pos)
+
 
 class TextLabel(ScrollableObject):
     """
@@ -218,18 +343,25 @@ class TextLabel(ScrollableObject):
     True
     """
     # Private Instance Attributes:
+    #   - _text: the text to display
     #   - _font: the font to render the text with
     #   - _colour: the colour to render the text with
+    #   - _surface: the text rendered with _font and _colour
+    #   - _size: the width and height of _surface
 
     # Representation Invariants:
     #   - all(0 <= n <= 255 for n in self._colour)
 
-    text: str
+    __slots__ = ('_text', '_font', '_colour', '_surface', '_size')
+
+    _text: str
     _font: pygame.font.Font
-    _colour: Tuple[int, int, int]
+    _colour: tuple[int, int, int]
+    _surface: pygame.Surface
+    _size: tuple[int, int]
 
     def __init__(self, x: int, y: int, text: str,
-                 font: pygame.font.Font, colour: Tuple[int, int, int]) -> None:
+                 font: pygame.font.Font, colour: tuple[int, int, int]) -> None:
         """
         Make a text box with top-left corner at (x, y), displaying text with specified font.
 
@@ -238,16 +370,41 @@ class TextLabel(ScrollableObject):
           - all(0 <= num <= 255 for num in colour)
         """
         super().__init__(x, y)
-        self.text = text
         self._font = font
         self._colour = colour
+        self.text = text  # renders the text
+
+    @property
+    def text(self) -> str:
+        """
+        Return the text to display.
+        """
+        return self._text
+
+    @text.setter
+    def text(self, text: str) -> None:
+        """
+        Change the text to display, and render it.
+
+        Preconditions:
+          - text != ""
+        """
+        self._text = text
+        self._surface = self._font.render(text, True, self._colour)
+        self._size = self._surface.get_size()
+        self._rect = None  # the text's size may have changed
 
     def draw(self, screen: pygame.Surface) -> None:
         """
         Draw the text box on the screen.
         """
-        text = self._font.render(self.text, True, self._colour)
-        screen.blit(text, self.get_coords())
+        screen.blit(self._surface, self._pos)
+
+    def _make_rect(self) -> pygame.Rect:
+        """
+        Return a new rectangle of the area that the text takes up on the screen.
+        """
+        return pygame.Rect(self._pos, self._size)
 
     def centerize_width(self, screen_w: int) -> None:
         """
@@ -256,8 +413,8 @@ class TextLabel(ScrollableObject):
         Preconditions:
           - screen_w > 0
         """
-        text_w = self._font.size(self.text)[0]
-        self._x = int(screen_w / 2 - text_w / 2)
+        text_w = self._size[0]
+        self.move_to((screen_w - text_w) >> 1, self._y)
 
 
 if __name__ == "__main__":
@@ -265,7 +422,7 @@ if __name__ == "__main__":
 
     python_ta.check_all(config={
         'max-line-length': 100,
-        'disable': ['R1705', 'C0200', 'W0401', 'E9999', 'E1101', 'R0913']
+        'disable': ['R1705', 'C0200', 'E9999', 'E1101', 'R0913']
     })
 
     import doctest